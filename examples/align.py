@@ -13,28 +13,30 @@ from vui import (RootLayout, HStackLayout, VStackLayout, View, LayersLayout,
 
 from colors import RED, BLACK, TEAL
 
-vstack = VStackLayout(background_color=BLACK)
+rows = []
 
 for flex_width in (False, True):
-    hstack = HStackLayout(background_color=TEAL)
+    cells = []
     for halign in (HAlign.LEFT, HAlign.CENTER, HAlign.FILL):
         for valign in (VAlign.TOP, VAlign.CENTER, VAlign.FILL):
-            if hstack.children:
-                hstack.add_child(
+            if cells:
+                cells.append(
                     Spacer(min_width=10,
                            flex_width=False,
                            background_color=BLACK))
-            hstack.add_child(
+            cells.append(
                 View(min_width=80,
-                        min_height=80,
-                        flex_width=flex_width,
-                        halign=halign,
-                        valign=valign,
-                        background_color=RED))
-
-    if vstack.children:
-        vstack.add_child(Spacer(min_height=10, flex_height=False))
-    vstack.add_child(hstack)
+                     min_height=80,
+                     flex_width=flex_width,
+                     halign=halign,
+                     valign=valign,
+                     background_color=RED))
+
+    if rows:
+        rows.append(Spacer(min_height=10, flex_height=False))
+    rows.append(HStackLayout(*cells, background_color=TEAL))
+
+vstack = VStackLayout(*rows, background_color=BLACK)
 
 window = pyglet.window.Window(width=1000, resizable=True)
 ui = RootLayout(window, vstack)
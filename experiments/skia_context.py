@@ -0,0 +1,26 @@
+"""Process-wide Skia GPU context shared by the experiments.
+
+Creating a GrDirectContext is expensive and Skia caches compiled shaders per
+context, so every window of a process should render through the same one.
+"""
+
+import skia
+
+
+_context = None
+
+
+def get_context():
+    """Returns the shared GrDirectContext, creating it on first use.
+
+    A GL context must be current on the calling thread the first time this is
+    called. The returned context is owned by the process: callers must not
+    abandon it when tearing down an individual window.
+    """
+    global _context
+    if _context is None:
+        if hasattr(skia, 'GrDirectContext'):
+            _context = skia.GrDirectContext.MakeGL()
+        else:
+            _context = skia.GrContext.MakeGL()
+    return _context
@@ -1,10 +1,13 @@
 import glfw
 import skia
 from OpenGL import GL as gl
-import time
+
+import skia_context
 
 WIDTH, HEIGHT = 640, 480
 
+GREEN = skia.Paint(Color=skia.ColorGREEN)
+
 
 def main():
     if not glfw.init():
@@ -17,7 +20,7 @@ def main():
 
     glfw.make_context_current(window)
 
-    context = skia.GrContext.MakeGL()
+    context = skia_context.get_context()
     backend_render_target = skia.GrBackendRenderTarget(
         WIDTH,
         HEIGHT,
@@ -29,22 +32,20 @@ def main():
         skia.kRGBA_8888_ColorType, skia.ColorSpace.MakeSRGB())
     assert surface is not None
 
-    start = time.time()
+    start = glfw.get_time()
     while (glfw.get_key(window, glfw.KEY_ESCAPE) != glfw.PRESS
            and not glfw.window_should_close(window)):
-        t = time.time() - start
+        t = glfw.get_time() - start
 
         gl.glClear(gl.GL_COLOR_BUFFER_BIT)
 
         with surface as canvas:
-            canvas.drawCircle(100 + 10 * t, 100 + 10 * t, 40,
-                              skia.Paint(Color=skia.ColorGREEN))
+            canvas.drawCircle(100 + 10 * t, 100 + 10 * t, 40, GREEN)
         surface.flushAndSubmit()
 
         glfw.swap_buffers(window)
         glfw.poll_events()
 
-    context.abandonContext()
     glfw.terminate()
 
 
@@ -3,6 +3,8 @@ import glfw
 import contextlib
 from OpenGL import GL
 
+import skia_context
+
 WIDTH, HEIGHT = 640, 480
 
 
@@ -19,7 +21,7 @@ def glfw_window():
 
 @contextlib.contextmanager
 def skia_surface(window):
-    context = skia.GrContext.MakeGL()
+    context = skia_context.get_context()
     backend_render_target = skia.GrBackendRenderTarget(
         WIDTH,
         HEIGHT,
@@ -31,7 +33,6 @@ def skia_surface(window):
         skia.kRGBA_8888_ColorType, skia.ColorSpace.MakeSRGB())
     assert surface is not None
     yield surface
-    context.abandonContext()
 
 
 with glfw_window() as window:
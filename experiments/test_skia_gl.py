@@ -1,9 +1,10 @@
 import glfw
 import math
 import skia
-import time
 from OpenGL import GL
 
+import skia_context
+
 
 class Renderer(object):
     GREEN = skia.Paint(Color=skia.ColorGREEN)
@@ -11,7 +12,7 @@ class Renderer(object):
 
     def __init__(self, window):
         self.window = window
-        self.context = skia.GrDirectContext.MakeGL()
+        self.context = skia_context.get_context()
         self.width, self.height = glfw.get_window_size(window)
         backend_render_target = skia.GrBackendRenderTarget(
             self.width,
@@ -26,14 +27,11 @@ class Renderer(object):
         self.font = skia.Font(skia.Typeface.MakeDefault(), size=40)
         print(self.font)
         self.text = skia.TextBlob.MakeFromString('drawTextBlob', self.font)
-        self.start = time.time()
+        self.start = glfw.get_time()
         assert self.surface is not None
 
-    def __del__(self):
-        self.context.abandonContext()
-
     def render(self):
-        t = time.time() - self.start
+        t = glfw.get_time() - self.start
         with self.surface as canvas:
             canvas.drawCircle(self.width/2 + 100 * math.cos(t), self.height/2 + 100 * math.sin(t), 40,
                               self.GREEN)
@@ -54,6 +54,14 @@ WS_SIZEBOX = WS_THICKFRAME
 WM_DESTROY = 2
 WM_PAINT = 15
 WM_CLOSE = 16
+WM_QUIT = 18
+
+PM_NOREMOVE = 0
+PM_REMOVE = 1
+
+QS_ALLINPUT = 0x04FF
+
+INFINITE = 0xFFFFFFFF
 
 DEFAULT_CHARSET = 1
 OUT_DEFAULT_PRECIS = 0
@@ -128,6 +136,14 @@ class Renderer(object):
     def __init__(self):
         self.hwnd = None
         self.dc = None
+        # window_proc runs for every message, so bind the ctypes function
+        # pointers and the paint data once instead of looking them up on the
+        # dll objects per message.
+        self._def_window_proc = user32.DefWindowProcW
+        self._post_quit_message = user32.PostQuitMessage
+        self._text_out = gdi32.TextOutW
+        self._text = 'Hello world. Привет'
+        self._text_len = len(self._text)
         self.font = gdi32.CreateFontW(
             30, 0,
             0, 0,
@@ -146,15 +162,14 @@ class Renderer(object):
         gdi32.SelectObject(self.dc, self.font)
 
     def window_proc(self, hwnd, uMsg, wParam, lParam):
-        if uMsg == WM_DESTROY:
+        if uMsg == WM_PAINT:
+            self._text_out(self.dc, 100, 100, self._text, self._text_len)
+        elif uMsg == WM_DESTROY:
             # print('window_proc', hwnd, 'WM_DESTROY', wParam, lParam)
-            user32.PostQuitMessage(0)
-        elif uMsg == WM_PAINT:
-            s = 'Hello world. Привет'
-            gdi32.TextOutW(self.dc, 100, 100, s, len(s))
+            self._post_quit_message(0)
         else:
             # print('window_proc', hwnd, uMsg, wParam, lParam)
-            return user32.DefWindowProcW(hwnd, uMsg, wParam, lParam)
+            return self._def_window_proc(hwnd, uMsg, wParam, lParam)
         return 0
 
 
@@ -202,13 +217,26 @@ def main():
     print('ShowWindow:', res)
 
     msg = MSG()
-    while True:
-        res = user32.GetMessageW(byref(msg), None, 0, 0)
-        # print('GetMessage:', res)
-        # print('MSG:', msg.hWnd, msg.message, msg.wParam, msg.lParam, msg.time)
-        if not res: break
-        user32.TranslateMessage(byref(msg))
-        user32.DispatchMessageW(byref(msg))
+    msg_p = byref(msg)
+    # The inner loop runs once per message, so bind everything it touches to
+    # locals instead of doing attribute lookups on the dll object per message.
+    peek_message = user32.PeekMessageW
+    translate_message = user32.TranslateMessage
+    dispatch_message = user32.DispatchMessageW
+    wait_for_messages = user32.MsgWaitForMultipleObjectsEx
+
+    running = True
+    while running:
+        # Block until something arrives in the queue, then drain it in one
+        # burst: under a mouse-move flood this dispatches the whole backlog
+        # without a kernel wait per message.
+        wait_for_messages(0, None, INFINITE, QS_ALLINPUT, 0)
+        while peek_message(msg_p, None, 0, 0, PM_REMOVE):
+            if msg.message == WM_QUIT:
+                running = False
+                break
+            translate_message(msg_p)
+            dispatch_message(msg_p)
 
     # if not glfw.init():
     #     raise RuntimeError('Failed to initialize GLFW')
@@ -1,7 +1,49 @@
-from .image import Image
-from .layout import (RootLayout, StackLayout, HStackLayout, VStackLayout,
-                     LayersLayout, Spacer)
-from .observable import Attribute, MaybeObservable, Observable, make_observable
-from .pane import Pane
-from .view import View, HAlign, VAlign
-from . import event
\ No newline at end of file
+"""Public interface of the vui package.
+
+The submodules are imported lazily (PEP 562) on first attribute access, so
+that `from vui import Observable` doesn't pay for loading pyglet's graphics
+stack, and importing the package stays cheap for code that only uses a subset
+of it.
+"""
+
+import importlib
+
+# Maps every public name to the submodule defining it.
+_name_to_module = {
+    'Image': '.image',
+    'RootLayout': '.layout',
+    'StackLayout': '.layout',
+    'HStackLayout': '.layout',
+    'VStackLayout': '.layout',
+    'LayersLayout': '.layout',
+    'Spacer': '.layout',
+    'layout_batch': '.layout',
+    'sync_layout': '.layout',
+    'Attribute': '.observable',
+    'MaybeObservable': '.observable',
+    'Observable': '.observable',
+    'make_observable': '.observable',
+    'Pane': '.pane',
+    'View': '.view',
+    'HAlign': '.view',
+    'VAlign': '.view',
+    'event': '.event',
+}
+
+__all__ = list(_name_to_module)
+
+
+def __getattr__(name: str):
+    module_name = _name_to_module.get(name)
+    if module_name is None:
+        raise AttributeError(
+            'module {!r} has no attribute {!r}'.format(__name__, name))
+    module = importlib.import_module(module_name, __name__)
+    value = module if name == 'event' else getattr(module, name)
+    # Cache the attribute so that subsequent lookups bypass this function.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -278,14 +278,22 @@ class EventDispatcher(object):
 
     See the module docstring for usage.
     """
-    # This field will contain the queues of event handlers for every supported
-    # event type. It is lazily initialized when the first event handler is added
-    # to the class. After that it contains a dictionary of lists, in which
-    # handlers are sorted according to their priority:
-    #     {'on_event': [(priority1, handler1),
-    #                   (priority2, handler2)]}
-    # Handlers are invoked until any one of them returns EVENT_HANDLED
-    _handlers = None
+    # Dispatchers are created per pane, so they carry their state in slots
+    # instead of an instance dict. __weakref__ is required because the
+    # dispatcher's own methods get wrapped in WeakMethod when it registers
+    # itself as a handler.
+    __slots__ = ('_handlers', '__weakref__')
+
+    def __init__(self):
+        # This field will contain the queues of event handlers for every
+        # supported event type. It is lazily initialized when the first event
+        # handler is added to the instance. After that it contains
+        # a dictionary of lists, in which handlers are sorted according to
+        # their priority:
+        #     {'on_event': [(priority1, handler1),
+        #                   (priority2, handler2)]}
+        # Handlers are invoked until any one of them returns EVENT_HANDLED
+        self._handlers = None
 
     @classmethod
     def register_event_type(cls, name):
@@ -531,6 +539,35 @@ class EventDispatcher(object):
             otherwise ``False``.  In pyglet 1.1 and earlier, the return value
             is always ``None``.
 
+        """
+        # Fast path: one dict lookup. The event-type validation and the lazy
+        # handler initialization only run when no queue is found, keeping
+        # them off the per-event cost of the common case.
+        handlers = self._handlers
+        if handlers is None:
+            return self._dispatch_event_slow(event_type, args)
+        handlers_queue = handlers.get(event_type)
+        if handlers_queue is None:
+            return self._dispatch_event_slow(event_type, args)
+        for _, handler in handlers_queue:
+            if isinstance(handler, WeakMethod):
+                handler = handler()
+                assert handler is not None
+            try:
+                if handler(*args):
+                    return EVENT_HANDLED
+            except TypeError as exception:
+                self._raise_dispatch_exception(
+                    event_type, args, handler, exception)
+
+        return EVENT_UNHANDLED
+
+    def _dispatch_event_slow(self, event_type, args):
+        """The miss path of `dispatch_event`.
+
+        Validates the event type and performs the lazy initialization of the
+        handler queues, then retries the dispatch if the initialization
+        produced handlers for this event.
         """
         if not hasattr(self.__class__, 'event_types'):
             self.__class__.event_types = []
@@ -545,18 +582,8 @@ class EventDispatcher(object):
             # Initialize the handlers with the object itself.
             self._handlers = {}
             self.push_handlers(self)
-
-        handlers_queue = self._handlers.get(event_type, ())
-        for _, handler in handlers_queue:
-            if isinstance(handler, WeakMethod):
-                handler = handler()
-                assert handler is not None
-            try:
-                if handler(*args):
-                    return EVENT_HANDLED
-            except TypeError as exception:
-                self._raise_dispatch_exception(
-                    event_type, args, handler, exception)
+            if self._handlers.get(event_type):
+                return self.dispatch_event(event_type, *args)
 
         return EVENT_UNHANDLED
 
@@ -1,10 +1,55 @@
+import functools
+import weakref
 import pyglet.image
+import pyglet.image.atlas
 from pyglet.image import AbstractImage
 from typing import Optional, Tuple, Union
 
 from .view import View, HAlign, VAlign
 from .observable import Attribute, MaybeObservable, Observable, make_observable
 
+# All images displayed by Image views are packed into shared texture atlases,
+# so that multiple images (or multiple views of the same image) are served
+# from one texture and don't force a texture rebind per draw. The bin is
+# created on first use: constructing it touches the GL context, which doesn't
+# exist yet when the module is merely imported.
+_texture_bin = None
+# Keyed weakly by the image object: an id()-keyed dict would hold no
+# reference to the image, so a recycled address could alias a dead entry
+# onto an unrelated image, and the entries would never be evicted. With
+# weak keys the cache entry dies together with the image.
+_texture_cache: 'weakref.WeakKeyDictionary[AbstractImage, object]' = \
+    weakref.WeakKeyDictionary()
+
+
+@functools.lru_cache(maxsize=None)
+def _load_image(path: str) -> AbstractImage:
+    """Loads an image from a file, memoized by path.
+
+    Image decoding is expensive, and the decoded image is never mutated, so
+    repeated Image views constructed from the same path share one load.
+    """
+    return pyglet.image.load(path)
+
+
+def _get_texture(data: AbstractImage):
+    """Returns a texture for the image, packed into the shared atlas.
+
+    The same image object always maps to the same texture region. Images too
+    big for the atlas fall back to a standalone texture.
+    """
+    global _texture_bin
+    texture = _texture_cache.get(data)
+    if texture is None:
+        if _texture_bin is None:
+            _texture_bin = pyglet.image.atlas.TextureBin()
+        try:
+            texture = _texture_bin.add(data)
+        except pyglet.image.atlas.AllocatorException:
+            texture = data.get_texture()
+        _texture_cache[data] = texture
+    return texture
+
 
 class Image(View):
     data: Attribute[Optional[AbstractImage]] = Attribute('data_')
@@ -17,7 +62,7 @@ class Image(View):
                  **kwargs):
         super().__init__(halign=halign, valign=valign, **kwargs)
         if type(data_or_path) is str:
-            data = pyglet.image.load(data_or_path)
+            data = _load_image(data_or_path)
         else:
             data = data_or_path
         self.data_: Observable[Optional[AbstractImage]] = make_observable(data)
@@ -27,7 +72,7 @@ class Image(View):
     def _update_data(self, data):
         self.content_width = data.width
         self.content_height = data.height
-        self._texture = data.get_texture(rectangle=True)
+        self._texture = _get_texture(data)
 
     def on_draw(self):
         x0, y0, x1, y1 = self.pane.coords
@@ -26,15 +26,139 @@ Provided layout objects:
   parent pane and a number of panes floating on top at arbitrary coordinates.
 """
 
-import enum
+import bisect
+import collections
+import contextlib
+import functools
+import itertools
 import pyglet  # type: ignore
 from typing import List, Optional, Tuple, Union
+from weakref import WeakMethod, WeakSet
 
 from .event import EVENT_HANDLED, EVENT_UNHANDLED
 from .observable import Attribute, Observable
 from .pane import Pane, DUMMY_PANE
 from .view import View
 
+# Source of paint generations for layer panes, see the comment on
+# _GENERATION_STRIDE in pane.py. Starts from 1: generation 0 is the root.
+_paint_generation = itertools.count(1)
+
+# Layouts whose relayout has been deferred to the end of the frame, in the
+# order the requests arrived. While the pyglet event loop is running, all the
+# relayout requests of one frame are collapsed into a single flush scheduled
+# on the clock; outside of the event loop (tests, setup code before
+# `pyglet.app.run()`) the requests are applied synchronously.
+_pending_relayouts: List['StackLayout'] = []
+_flush_scheduled = False
+_batch_depth = 0
+
+
+# Live RootLayout instances, so that the relayout flush can mark them
+# dirty. Weak: the module must not keep closed windows alive.
+_roots: 'WeakSet[RootLayout]' = WeakSet()
+
+
+def _flush_relayouts(dt=0):
+    global _flush_scheduled
+    _flush_scheduled = False
+    if not _pending_relayouts:
+        return
+    while _pending_relayouts:
+        _pending_relayouts.pop(0)._update()
+    # Any relayout may have moved panes, so the next frame has to be
+    # rendered. Marking every root over-approximates, but roots are few and
+    # a spurious dirty frame is cheap.
+    for root in _roots:
+        root.mark_dirty()
+
+
+def sync_layout():
+    """Immediately applies the relayouts deferred to the end of the frame.
+
+    While the application is running, layout updates triggered by attribute
+    changes are batched and applied once per frame. Code that needs to read
+    the resulting pane coordinates in the same frame can call this to force
+    the pending updates through.
+    """
+    _flush_relayouts()
+
+
+# Work list for the iterative on_draw dispatch, drained LIFO so that the
+# panes are visited in the same depth-first order as the old recursive
+# dispatch. Drawing is single-threaded, so one module-level deque suffices.
+_draw_queue: 'collections.deque[Pane]' = collections.deque()
+_draining = False
+
+
+def _dispatch_draw(panes):
+    """Dispatches 'on_draw' to the panes and their visible descendants.
+
+    Layouts call this with their child panes instead of recursing: the panes
+    are pushed onto a shared stack, and only the outermost call drains it.
+    This turns the draw traversal into one flat loop per frame instead of a
+    Python call chain as deep as the view hierarchy.
+    """
+    global _draining
+    _draw_queue.extend(panes)
+    if _draining:
+        return
+    _draining = True
+    try:
+        while _draw_queue:
+            pane = _draw_queue.pop()
+            # Walk the handler queue directly: 'on_draw' takes no arguments
+            # and is dispatched once per pane per frame, so the generic
+            # dispatch_event entry point (name validation, argument
+            # forwarding, the TypeError diagnostics) is skipped. The queue is
+            # already priority-sorted, so the semantics are the same.
+            handlers = pane._handlers
+            queue = handlers.get('on_draw') if handlers is not None else None
+            if queue is None:
+                pane.dispatch_event('on_draw')
+                continue
+            for _, handler in queue:
+                if type(handler) is WeakMethod:
+                    handler = handler()
+                if handler():
+                    break
+    finally:
+        _draining = False
+
+
+@contextlib.contextmanager
+def layout_batch():
+    """Defers relayouts triggered inside the block until it exits.
+
+    Useful for bulk mutations (resizing many children, toggling visibility
+    of several views): each affected layout is recomputed once at the end of
+    the block instead of once per mutated attribute. Nesting is allowed; the
+    deferred updates run when the outermost block exits.
+    """
+    global _batch_depth
+    _batch_depth += 1
+    try:
+        yield
+    finally:
+        _batch_depth -= 1
+        if _batch_depth == 0:
+            _flush_relayouts()
+
+
+def _request_relayout(layout: 'StackLayout'):
+    global _flush_scheduled
+    if layout not in _pending_relayouts:
+        _pending_relayouts.append(layout)
+    if _batch_depth:
+        return
+    event_loop = pyglet.app.event_loop
+    if event_loop is not None and event_loop.is_running:
+        if not _flush_scheduled:
+            _flush_scheduled = True
+            pyglet.clock.schedule_once(_flush_relayouts, 0)
+        return
+    _flush_relayouts()
+
 
 class RootLayout(object):
     """The root of the views hierarchy, wrapping a Pyglet window.
@@ -44,7 +168,33 @@ class RootLayout(object):
     """
     def __init__(self, window: pyglet.window.Window, child: View = None):
         self.dragging_: Observable[bool] = Observable(False)
-        self.child_pane = Pane(0, 0, window.width, window.height)
+        # The background rectangles of the pane hierarchy are collected
+        # into this batch and drawn in a single call per frame, before the
+        # on_draw dispatch. LayersLayout subtrees use batches of their own,
+        # drawn between the layer traversals, so that an upper layer's
+        # backgrounds cover the content of the layers below it.
+        self.batch = pyglet.graphics.Batch()
+        self.child_pane = Pane(0, 0, window.width, window.height,
+                               batch=self.batch)
+        # True when something changed since the last on_draw. The pyglet event
+        # loop redraws every frame regardless (the back buffer contents are
+        # undefined after a flip, so skipping a draw is not safe), but
+        # applications that drive their own loop can check `dirty` to decide
+        # whether to render and flip at all. The flag is set by window
+        # resizes, by the relayout flush (covering attribute changes that
+        # move, resize, hide or reveal panes) and by mouse position changes;
+        # state that only affects custom drawing inside a view is invisible
+        # to the layout system and has to be reported with `mark_dirty`.
+        self._dirty = True
+        self.child_pane.coords_.observe(self.mark_dirty)
+        _roots.add(self)
+        # The latest mouse position not yet pushed into the pane hierarchy.
+        # High-poll mice report motion much more often than the frame rate,
+        # and every push walks the tree through _observe_mouse_pos, so plain
+        # motion is applied once per frame in on_draw. Drags keep dispatching
+        # immediately: they drive direct manipulation and need the latency.
+        self._pending_mouse_pos: Optional[Tuple[float, float]] = None
+        self._mouse_moved = False
         self._child = child
         if child is not None:
             child.attach(self.child_pane)
@@ -65,44 +215,127 @@ class RootLayout(object):
 
     @child.setter
     def child(self, value: View):
-        if self._child is not None:
-            self._child.detach()
+        old = self._child
+        if old is value:
+            return
         self._child = value
-        self._child.attach(self.child_pane)
+        if old is not None:
+            if old.pane is self.child_pane:
+                # The new child takes over the same pane, so unregister the
+                # old one directly instead of a full detach: detach would
+                # reset the pane background to None only for the attach
+                # below to immediately replace it.
+                self.child_pane.remove_handlers(old)
+                self.child_pane.remove_observer(old)
+            else:
+                old.detach()
+        value.attach(self.child_pane)
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def mark_dirty(self, *args):
+        """Records that the contents changed since the last drawn frame."""
+        self._dirty = True
 
     def on_draw(self):
-        self.child_pane.dispatch_event('on_draw')
+        if self._mouse_moved:
+            self._mouse_moved = False
+            self.child_pane.mouse_pos = self._pending_mouse_pos
+        self.batch.draw()
+        _dispatch_draw((self.child_pane,))
+        self._dirty = False
 
     def on_mouse_enter(self, x, y):
+        self._mouse_moved = False
+        self._dirty = True
         self.child_pane.mouse_pos = (x, y)
 
     def on_mouse_leave(self, x, y):
+        # Cancels any coalesced motion so that it isn't applied after the
+        # cursor has already left the window.
+        self._mouse_moved = False
+        self._dirty = True
         self.child_pane.mouse_pos = None
 
     def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
+        # Zero-delta drags are still dispatched: pyglet emits them and they
+        # carry the button state; the redundant mouse_pos write is already
+        # filtered out by Observable.set.
+        self._dirty = True
         self.child_pane.mouse_pos = (x, y)
         self.child_pane.dispatch_event('on_mouse_drag', x, y, dx, dy, buttons,
                                        modifiers)
 
     def on_mouse_motion(self, x, y, dx, dy):
-        self.child_pane.mouse_pos = (x, y)
+        self._pending_mouse_pos = (x, y)
+        self._mouse_moved = True
+        # The coalesced position is applied inside on_draw, so the frame
+        # has to be rendered for it to take effect.
+        self._dirty = True
 
-    def on_mouse_press(self, *args):
-        self.child_pane.dispatch_event('on_mouse_press', *args)
+    def on_mouse_press(self, x, y, button, modifiers):
+        self.child_pane.dispatch_event('on_mouse_press', x, y, button,
+                                       modifiers)
 
-    def on_mouse_release(self, *args):
-        self.child_pane.dispatch_event('on_mouse_release', *args)
+    def on_mouse_release(self, x, y, button, modifiers):
+        self.child_pane.dispatch_event('on_mouse_release', x, y, button,
+                                       modifiers)
 
-    def on_mouse_scroll(self, *args):
-        self.child_pane.dispatch_event('on_mouse_scroll', *args)
+    def on_mouse_scroll(self, x, y, scroll_x, scroll_y):
+        self.child_pane.dispatch_event('on_mouse_scroll', x, y, scroll_x,
+                                       scroll_y)
 
     def on_resize(self, width, height):
-        self.child_pane.alloc_coords = (0, 0, width, height)
+        # One resize fans out through the whole hierarchy; batching it makes
+        # every nested layout recompute once.
+        with layout_batch():
+            self.child_pane.alloc_coords = (0, 0, width, height)
 
 
-class Orientation(enum.Enum):
-    HORIZONTAL = 1
-    VERTICAL = 2
+def _distribute(sizes: List[float], flexes: List[bool], lo: float, hi: float,
+                extra: float) -> List[Tuple[float, float]]:
+    """Computes the child intervals along one axis of a stack layout.
+
+    Lays the intervals out one after another starting from `lo` towards `hi`.
+    Children with `flex` = True receive `extra` additional space; fixed
+    children are clamped at `hi` when the pane overflows. Works on plain
+    values only, so it can be shared by both stack orientations (the vertical
+    stack passes negated coordinates to lay the children out top to bottom).
+    """
+    # Folding the flex test into arithmetic (the bool multiplies the
+    # pre-clamped extra) leaves a single uniform add-and-clamp per child
+    # instead of a data-dependent branch. When extra is positive the clamp
+    # only bites on the last span's rounding error, so it is equivalent to
+    # the old min() on the fixed children.
+    extra_pos = extra if extra > 0 else 0.0
+
+    # The example scenes are dominated by stacks of one or two children, and
+    # for those the general loop below spends most of its time on the zip
+    # iterator and list bookkeeping. Handle them with straight-line code.
+    n = len(sizes)
+    if n == 1:
+        end = lo + sizes[0] + extra_pos * flexes[0]
+        return [(lo, end if end <= hi else hi)]
+    if n == 2:
+        mid = lo + sizes[0] + extra_pos * flexes[0]
+        if mid > hi:
+            mid = hi
+        end = mid + sizes[1] + extra_pos * flexes[1]
+        if end > hi:
+            end = hi
+        return [(lo, mid), (mid, end)]
+
+    spans = []
+    x = lo
+    for size, flex in zip(sizes, flexes):
+        next_x = x + size + extra_pos * flex
+        if next_x > hi:
+            next_x = hi
+        spans.append((x, next_x))
+        x = next_x
+    return spans
 
 
 class StackLayout(View):
@@ -116,8 +349,14 @@ class StackLayout(View):
     left after accounting for `derived_*` for all children is distributed
     equally between children with `flex_*` = True.
     # """
+    __slots__ = ('children', '_mouseover_pane',
+                 '_dragging_pane', '_dragging_button', '_layout_cache',
+                 '_flex_count_w', '_flex_count_h', '_hit_children',
+                 '_hit_bounds', '_derived_w', '_derived_h', '_flex_w',
+                 '_flex_h', '_hidden', '_visible_children', '_visible_idx',
+                 '_last_coords')
+
     def __init__(self,
-                 orientation: Orientation,
                  *children: View,
                  flex_width=True,
                  flex_height=True,
@@ -126,14 +365,51 @@ class StackLayout(View):
                          flex_height=flex_height,
                          **kwargs)
 
-        self.orientation = orientation
         self._mouseover_pane: Optional[Pane] = None
         self._dragging_pane = None
         self._dragging_button = 0
 
+        # Maps the coords of the parent pane to the list of child alloc_coords
+        # computed for them. Since the child pane allocation depends only on
+        # the available space and on the child dimension attributes, we can
+        # reuse previously computed allocations until one of the inputs
+        # changes. The cache is dropped whenever a child's derived size or
+        # flex_* attribute is updated, or a child is added.
+        self._layout_cache = {}
+        # The pane coords the current allocation was computed for; lets
+        # _update recognize a pure translation of the pane.
+        self._last_coords = None
+        # Counts of visible flex children along each axis, recomputed lazily
+        # in _place. They only change together with the layout cache, so they
+        # are invalidated by the same observers.
+        self._flex_count_w: Optional[int] = None
+        self._flex_count_h: Optional[int] = None
+
+        # The visible children in layout order and the sorted far boundaries
+        # of their allocated spans (negated for the vertical orientation).
+        # Since the spans tile the pane along the axis, the child under a
+        # point is found by bisecting the boundaries. Refreshed by _place.
+        self._hit_children: List[View] = []
+        self._hit_bounds: List[float] = []
+
+        # Parallel lists mirroring the child attributes the layout reads on
+        # every relayout. A relayout then walks these flat lists instead of
+        # chasing the observables of every child; the per-child observers
+        # registered in `extend_children` keep the lists in sync.
+        self._derived_w: List[float] = []
+        self._derived_h: List[float] = []
+        self._flex_w: List[bool] = []
+        self._flex_h: List[bool] = []
+        self._hidden: List[bool] = []
+
+        # The children that take part in layout and drawing, with their
+        # indices into the mirrored lists above. Recomputed only when a
+        # child's hidden_ flips, so the per-frame loops never have to filter.
+        self._visible_children: List[View] = []
+        self._visible_idx: List[int] = []
+
         self.children = []
-        for child in children:
-            self.add_child(child)
+        self.extend_children(children)
 
     def __str__(self):
         content = ''
@@ -146,32 +422,60 @@ class StackLayout(View):
         return '{}[{}]({})'.format(self.__class__.__name__, self.pane, content)
 
     def add_child(self, child: View):
-        self.children.append(child)
+        self.extend_children((child,))
+
+    def extend_children(self, children):
+        """Appends several child views at once.
 
-        child.derived_width_.observe(self._update_content_width)
-        child.derived_height_.observe(self._update_content_height)
+        The content dimensions of the layout are recomputed once at the end,
+        rather than once per added child as a sequence of `add_child` calls
+        would do.
+        """
+        partial = functools.partial
+        for child in children:
+            i = len(self.children)
+            self.children.append(child)
+            self._derived_w.append(child.derived_width)
+            self._derived_h.append(child.derived_height)
+            self._flex_w.append(child.flex_width)
+            self._flex_h.append(child.flex_height)
+            self._hidden.append(child.hidden)
+            child.derived_width_.observe(partial(self._on_child_derived_w, i))
+            child.derived_height_.observe(
+                partial(self._on_child_derived_h, i))
+            child.flex_width_.observe(partial(self._on_child_flex_w, i))
+            child.flex_height_.observe(partial(self._on_child_flex_h, i))
+            child.hidden_.observe(partial(self._on_child_hidden, i))
+        self._rebuild_visible()
+        self._invalidate_layout_cache()
         self.content_width = self._calc_content_width()
         self.content_height = self._calc_content_height()
 
     def attach(self, pane: Pane):
         super().attach(pane)
-        pane.coords_.observe(self._update)
+        pane.coords_.observe(self._request_update)
         pane.mouse_pos_.observe(self._observe_mouse_pos)
 
-        # Currently we first attach all the child views to empty panes,
-        # and then resize them. This is not optimal, since a lot of code will be
-        # executed twice. But this is conceptually simpler, so we'll do it for
-        # v0. Will probably optimize later.
-
-        x0, y0, x1, y1 = pane.coords
-        if self.orientation == Orientation.HORIZONTAL:
-            y0 = y1
-        else:
-            x1 = x0
-        for child in self.children:
-            child_pane = Pane(x0, y0, x1, y1)
-            child.attach(child_pane)
-        self._update()
+        # Compute the final allocations first and create every child pane
+        # already at its target coordinates. Attaching to a collapsed pane
+        # and resizing afterwards would run the whole observer cascade
+        # (alignment, background shapes, nested layouts) twice per child.
+        collapsed = self._collapsed_rect(pane.coords)
+
+        visible, rects, bounds = self._alloc_rects()
+        self._hit_children = visible
+        self._hit_bounds = bounds
+        rect_iter = iter(rects)
+        for i, child in enumerate(self.children):
+            rect = collapsed if self._hidden[i] else next(rect_iter)
+            child.attach(Pane(*rect, batch=pane.batch,
+                              depth=pane.depth + 1,
+                              generation=pane.generation))
+        # Prime the layout cache with the allocation just applied.
+        self._last_coords = pane.coords
+        self._layout_cache[pane.coords] = (
+            [child.pane.alloc_coords_.value for child in self.children],
+            visible, bounds)
 
     def detach(self):
         for child in self.children:
@@ -179,20 +483,29 @@ class StackLayout(View):
         super().detach()
 
     def _find_child_pane(self, x, y) -> Optional[Pane]:
-        """Returns the child contining (x, y) or None."""
+        """Returns the child contining (x, y) or None.
+
+        The allocated child spans are sorted and tile the pane along the
+        stack axis, so instead of scanning the children the span containing
+        the point is found with a binary search; the candidate is then
+        checked against its active area.
+        """
         if (self._mouseover_pane is not None
                 and self._mouseover_pane.contains(x, y)):
             return self._mouseover_pane
-        for child in self.children:
-            child_pane = child.pane
-            assert child_pane is not None
-            if child_pane.contains(x, y):
-                return child_pane
+        i = self._hit_index(x, y)
+        if i < len(self._hit_children):
+            pane = self._hit_children[i].pane
+            if pane.contains(x, y):
+                return pane
         return None
 
     def on_draw(self):
-        for child in self.children:
-            child.pane.dispatch_event('on_draw')
+        # Hidden subtrees are pruned here instead of relying on each child's
+        # on_draw_check_hidden handler. Pushed in reverse so that the LIFO
+        # drain in _dispatch_draw visits the children in order.
+        _dispatch_draw(
+            child.pane for child in reversed(self._visible_children))
 
     def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
         if self._dragging_pane is None:
@@ -225,6 +538,14 @@ class StackLayout(View):
                                        scroll_y)
 
     def _observe_mouse_pos(self, pos: Optional[Tuple[float, float]]):
+        # While a drag is in progress the receiving pane is pinned, so the
+        # position is forwarded to it without hit-testing: on_mouse_drag
+        # dispatches to the same pane anyway, and re-running the hit test
+        # here would walk the tree a second time per drag event.
+        dragging = self._dragging_pane
+        if dragging is not None and pos is not None:
+            dragging.mouse_pos = pos
+            return
         if pos is None:
             if self._mouseover_pane is not None:
                 self._mouseover_pane.mouse_pos = None
@@ -239,13 +560,52 @@ class StackLayout(View):
         if self._mouseover_pane is not None:
             self._mouseover_pane.mouse_pos = pos
 
-    def _update_content_width(self, *args):
-        self.content_width = self._calc_content_width()
-        self._update()
-
-    def _update_content_height(self, *args):
-        self.content_height = self._calc_content_height()
-        self._update()
+    def _on_child_derived_w(self, i, value):
+        old = self._derived_w[i]
+        self._derived_w[i] = value
+        self._invalidate_layout_cache()
+        self.content_width = self._content_width_on_change(old, value)
+        self._request_update()
+
+    def _on_child_derived_h(self, i, value):
+        old = self._derived_h[i]
+        self._derived_h[i] = value
+        self._invalidate_layout_cache()
+        self.content_height = self._content_height_on_change(old, value)
+        self._request_update()
+
+    def _on_child_flex_w(self, i, value):
+        self._flex_w[i] = value
+        self._invalidate_layout_cache()
+        self._request_update()
+
+    def _on_child_flex_h(self, i, value):
+        self._flex_h[i] = value
+        self._invalidate_layout_cache()
+        self._request_update()
+
+    def _on_child_hidden(self, i, value):
+        self._hidden[i] = value
+        self._rebuild_visible()
+        self._invalidate_layout_cache()
+        self._request_update()
+
+    def _rebuild_visible(self):
+        self._visible_children = []
+        self._visible_idx = []
+        for i, child in enumerate(self.children):
+            if not self._hidden[i]:
+                self._visible_children.append(child)
+                self._visible_idx.append(i)
+
+    def _invalidate_layout_cache(self, *args):
+        self._layout_cache.clear()
+        self._last_coords = None
+        self._flex_count_w = None
+        self._flex_count_h = None
+
+    def _request_update(self, *args):
+        _request_relayout(self)
 
     def _calc_content_width(self):
         raise NotImplementedError('Should be overridden')
@@ -253,82 +613,240 @@ class StackLayout(View):
     def _calc_content_height(self):
         raise NotImplementedError('Should be overridden')
 
+    def _content_width_on_change(self, old, new):
+        """Returns the content width after one child's size change.
+
+        Overridden so that the summed axis is updated in O(1) from the delta
+        and the max axis rescans only when the maximum could have changed.
+        """
+        raise NotImplementedError('Should be overridden')
+
+    def _content_height_on_change(self, old, new):
+        raise NotImplementedError('Should be overridden')
+
+    def _max_after_change(self, current, old, new, rescan):
+        """Maintains a running maximum across one element change."""
+        if new >= current:
+            return new
+        if old == current:
+            return rescan()
+        return current
+
     def _update(self, *args):
+        """Allocates the child panes for the current pane coords.
+
+        Consults the layout cache first: for a given set of child dimensions
+        the resulting allocation depends only on the pane coords, so repeated
+        layouts at a previously seen size (e.g. when a window is resized back
+        and forth) reuse the stored result instead of redistributing space.
+        """
+        if self.pane is None:
+            return
+        coords = self.pane.coords_.value
+        cached = self._layout_cache.get(coords)
+        if cached is not None:
+            allocs, self._hit_children, self._hit_bounds = cached
+            self._last_coords = coords
+            for child, child_coords in zip(self.children, allocs):
+                # Target the raw observable: the Attribute descriptor is
+                # sugar for external callers, and this loop runs per child
+                # on every relayout.
+                child.pane.alloc_coords_.set(child_coords)
+            return
+        last = self._last_coords
+        if last is not None:
+            dx = coords[0] - last[0]
+            dy = coords[1] - last[1]
+            if coords[2] - last[2] == dx and coords[3] - last[3] == dy:
+                # The pane moved without resizing (an ancestor was dragged
+                # or realigned): the relative layout is unchanged, so shift
+                # the existing allocations by the delta instead of
+                # redistributing the space.
+                allocs = []
+                for child in self.children:
+                    x0, y0, x1, y1 = child.pane.alloc_coords_.value
+                    rect = (x0 + dx, y0 + dy, x1 + dx, y1 + dy)
+                    child.pane.alloc_coords_.set(rect)
+                    allocs.append(rect)
+                shift = self._bounds_shift(dx, dy)
+                self._hit_bounds = [b + shift for b in self._hit_bounds]
+                self._last_coords = coords
+                # Deliberately not cached: a dragged ancestor produces a new
+                # position every frame, and storing each one would flood the
+                # cache and flush out the size-keyed entries. Revisiting a
+                # position re-runs this shift, which costs about as much as
+                # the cache hit would.
+                return
+        self._place()
+        self._last_coords = coords
+        if len(self._layout_cache) >= 64:
+            self._layout_cache.clear()
+        self._layout_cache[coords] = (
+            [child.pane.alloc_coords_.value for child in self.children],
+            self._hit_children, self._hit_bounds)
+
+    def _place(self):
+        visible, rects, bounds = self._alloc_rects()
+        self._hit_children = visible
+        self._hit_bounds = bounds
+        for child, rect in zip(visible, rects):
+            child.pane.alloc_coords_.set(rect)
+
+    def _alloc_rects(self):
+        """Computes the allocations of the visible children.
+
+        Returns the visible children, their alloc coords and the sorted far
+        span boundaries used for hit testing. Doesn't touch the child panes,
+        so it can also run before they exist (in `attach`).
+        """
+        raise NotImplementedError('Should be overridden')
+
+    def _collapsed_rect(self, coords):
+        """Returns a zero-size rect for hidden children along the stack axis."""
+        raise NotImplementedError('Should be overridden')
+
+    def _hit_index(self, x, y):
+        """Returns the index of the allocated span containing the point."""
+        raise NotImplementedError('Should be overridden')
+
+    def _bounds_shift(self, dx, dy):
+        """Returns the hit-bound delta for a pane translation by (dx, dy)."""
         raise NotImplementedError('Should be overridden')
 
 
 class HStackLayout(StackLayout):
-    def __init__(self, *args, **kwargs):
-        super().__init__(Orientation.HORIZONTAL, *args, **kwargs)
+    __slots__ = ()
+
+    def _collapsed_rect(self, coords):
+        x0, y0, x1, y1 = coords
+        return (x0, y1, x1, y1)
+
+    def _hit_index(self, x, y):
+        return bisect.bisect_right(self._hit_bounds, x)
+
+    def _bounds_shift(self, dx, dy):
+        return dx
 
     def _calc_content_width(self):
-        return sum(c.derived_width for c in self.children)
+        return sum(self._derived_w)
 
     def _calc_content_height(self):
-        return max(c.derived_height for c in self.children) if self.children else 0
+        return max(self._derived_h) if self._derived_h else 0
 
-    def _update(self, *args):
-        x0, y0, x1, y1 = self.pane.coords
+    def _content_width_on_change(self, old, new):
+        return self.content_width_.value + new - old
+
+    def _content_height_on_change(self, old, new):
+        return self._max_after_change(self.content_height_.value, old, new,
+                                      self._calc_content_height)
+
+    def _alloc_rects(self):
+        x0, y0, x1, y1 = self.pane.coords_.value
         width = x1 - x0
 
-        count_flex = sum(child.flex_width for child in self.children
-                         if not child.hidden)
-        extra = (width - self.derived_width) / max(count_flex, 1)
+        # Gather the metrics of the visible children from the mirrored
+        # lists, so that the code below works on plain locals instead of
+        # going through the observable attributes for every read.
+        visible = self._visible_children
+        derived = self._derived_w
+        flex = self._flex_w
+        sizes = [derived[i] for i in self._visible_idx]
+        flexes = [flex[i] for i in self._visible_idx]
+
+        count_flex = self._flex_count_w
+        if count_flex is None:
+            count_flex = sum(flexes)
+            self._flex_count_w = count_flex
+        # With no flex children `extra` is multiplied by zero everywhere, so
+        # the division can be skipped instead of clamping the divisor.
+        if count_flex:
+            extra = (width - self.derived_width_.value) / count_flex
+        else:
+            extra = 0.0
 
-        x = x0
-        for child in self.children:
-            if child.hidden:
-                continue
-            if extra <= 0 or not child.flex_width:
-                next_x = min(x + child.derived_width, x1)
-            else:
-                next_x = x + child.derived_width + extra
-            child.pane.alloc_coords = (x, y0, next_x, y1)
-            x = next_x
+        spans = _distribute(sizes, flexes, x0, x1, extra)
+        rects = [(start, y0, end, y1) for start, end in spans]
+        return visible, rects, [end for _, end in spans]
 
 
 class VStackLayout(StackLayout):
-    def __init__(self, *args, **kwargs):
-        super().__init__(Orientation.VERTICAL, *args, **kwargs)
+    __slots__ = ()
+
+    def _collapsed_rect(self, coords):
+        x0, y0, x1, y1 = coords
+        return (x0, y0, x0, y1)
+
+    def _hit_index(self, x, y):
+        return bisect.bisect_left(self._hit_bounds, -y)
+
+    def _bounds_shift(self, dx, dy):
+        return -dy
 
     def _calc_content_width(self):
-        return max(c.derived_width for c in self.children) if self.children else 0
+        return max(self._derived_w) if self._derived_w else 0
 
     def _calc_content_height(self):
-        return sum(c.derived_height for c in self.children)
+        return sum(self._derived_h)
 
-    def _update(self, *args):
-        x0, y0, x1, y1 = self.pane.coords
+    def _content_width_on_change(self, old, new):
+        return self._max_after_change(self.content_width_.value, old, new,
+                                      self._calc_content_width)
+
+    def _content_height_on_change(self, old, new):
+        return self.content_height_.value + new - old
+
+    def _alloc_rects(self):
+        x0, y0, x1, y1 = self.pane.coords_.value
         height = y1 - y0
 
-        count_flex = sum(child.flex_height for child in self.children
-                         if not child.hidden)
-        extra = (height - self.derived_height) / max(count_flex, 1)
+        # Same structure as HStackLayout._alloc_rects: gather the metrics of
+        # the visible children from the mirrored lists, then measure.
+        visible = self._visible_children
+        derived = self._derived_h
+        flex = self._flex_h
+        sizes = [derived[i] for i in self._visible_idx]
+        flexes = [flex[i] for i in self._visible_idx]
+
+        count_flex = self._flex_count_h
+        if count_flex is None:
+            count_flex = sum(flexes)
+            self._flex_count_h = count_flex
+        if count_flex:
+            extra = (height - self.derived_height_.value) / count_flex
+        else:
+            extra = 0.0
 
-        y = y1
-        for child in self.children:
-            if child.hidden:
-                continue
-            if extra <= 0 or not child.flex_height:
-                next_y = max(y - child.derived_height, y0)
-            else:
-                next_y = y - child.derived_height - extra
-            child.pane.alloc_coords = (x0, next_y, x1, y)
-            y = next_y
+        # The children go from the top of the pane downwards, which is
+        # _distribute with the y axis negated.
+        spans = _distribute(sizes, flexes, -y1, -y0, extra)
+        rects = [(x0, -end, x1, -start) for start, end in spans]
+        return visible, rects, [end for _, end in spans]
 
 
 class LayersLayout(View):
+    __slots__ = ('children', '_mouseover_pane', '_child_rects', '_rpanes',
+                 '_layer_batches', '_derived_w', '_derived_h')
+
     def __init__(self, *children, **kwargs):
         super().__init__(**kwargs)
         self.children = children
-        for child in children:
-            child.derived_width_.observe(self._update_content_width)
-            child.derived_height_.observe(self._update_content_height)
+        # Mirrors of the child derived sizes, as in StackLayout: with the
+        # previous value at hand, a size change only rescans the children
+        # when the running maximum could actually move.
+        self._derived_w: List[float] = []
+        self._derived_h: List[float] = []
+        partial = functools.partial
+        for i, child in enumerate(children):
+            self._derived_w.append(child.derived_width)
+            self._derived_h.append(child.derived_height)
+            child.derived_width_.observe(partial(self._on_child_derived_w, i))
+            child.derived_height_.observe(
+                partial(self._on_child_derived_h, i))
 
         self._mouseover_pane = DUMMY_PANE
 
-        self._update_content_width()
-        self._update_content_height()
+        self.content_width = max(self._derived_w)
+        self.content_height = max(self._derived_h)
 
     def __str__(self):
         content = ''
@@ -346,20 +864,69 @@ class LayersLayout(View):
         pane.mouse_pos_.observe(self._observe_mouse_pos)
 
         x0, y0, x1, y1 = pane.coords
-        for child in self.children:
-            child_pane = Pane(x0, y0, x1, y1)
+        # Layer subtrees cover each other, so every layer gets a fresh paint
+        # generation to keep the painting order of the backgrounds well
+        # defined. The attach order matches the draw order, so the counter
+        # hands out increasing generations to the layers from bottom to top.
+        # As in StackLayout, _child_rects mirrors the child pane coords for
+        # hit testing.
+        #
+        # Every layer subtree draws its backgrounds into a batch of its own,
+        # flushed right before the layer's content: a single shared batch
+        # would paint all the backgrounds first and let the custom-drawn
+        # content of a lower layer (e.g. a blitted image) bleed through the
+        # backgrounds of the layers above it. The list keeps the batches
+        # alive; the per-pane on_draw handler holds them only weakly.
+        self._child_rects = []
+        self._layer_batches = []
+        for i, child in enumerate(self.children):
+            if pane.batch is not None:
+                layer_batch = pyglet.graphics.Batch()
+            else:
+                layer_batch = None
+            child_pane = Pane(x0, y0, x1, y1, batch=layer_batch,
+                              depth=pane.depth + 1,
+                              generation=next(_paint_generation))
+            if layer_batch is not None:
+                self._layer_batches.append(layer_batch)
+                # Priority 1 matches Pane.on_draw: after the hidden check
+                # (priority 2) but before the layer view's content.
+                child_pane.push_handlers(on_draw=layer_batch.draw,
+                                         priority=1)
+            self._child_rects.append(child_pane.coords)
+            child_pane.coords_.observe(
+                functools.partial(self._set_child_rect, i))
             child.attach(child_pane)
+        # The child panes from the bottom layer up, precomputed so that the
+        # per-frame draw fan-out doesn't rebuild a reversed iterator over the
+        # children.
+        self._rpanes = tuple(child.pane for child in reversed(self.children))
+
+    def _set_child_rect(self, i, coords):
+        self._child_rects[i] = coords
 
     def detach(self):
         for child in self.children:
             child.detach()
         super().detach()
 
-    def _update_content_width(self, *args):
-        self.content_width = max(c.derived_width for c in self.children)
-
-    def _update_content_height(self, *args):
-        self.content_height = max(c.derived_height for c in self.children)
+    def _on_child_derived_w(self, i, value):
+        old = self._derived_w[i]
+        self._derived_w[i] = value
+        current = self.content_width_.value
+        if value >= current:
+            self.content_width = value
+        elif old == current:
+            self.content_width = max(self._derived_w)
+
+    def _on_child_derived_h(self, i, value):
+        old = self._derived_h[i]
+        self._derived_h[i] = value
+        current = self.content_height_.value
+        if value >= current:
+            self.content_height = value
+        elif old == current:
+            self.content_height = max(self._derived_h)
 
     def _update_coords(self, coords: Tuple[float, float, float, float]):
         for child in self.children:
@@ -369,32 +936,35 @@ class LayersLayout(View):
         """Returns the child contining (x, y) or None."""
         if self._mouseover_pane.contains(x, y):
             return self._mouseover_pane
-        for child in reversed(self.children):
-            child_pane = child.pane
-            assert child_pane is not None
-            if child_pane.contains(x, y):
-                return child_pane
+        rects = self._child_rects
+        # Top layers are hit first.
+        for i in range(len(rects) - 1, -1, -1):
+            x0, y0, x1, y1 = rects[i]
+            if x0 <= x < x1 and y0 <= y < y1:
+                return self.children[i].pane
         return DUMMY_PANE
 
     def on_draw(self):
-        for child in self.children:
-            child.pane.dispatch_event('on_draw')
+        # The bottom layer is drawn (and therefore pushed) first, same as in
+        # StackLayout.on_draw.
+        _dispatch_draw(self._rpanes)
+
+    def _dispatch_topdown(self, event, x, y, *args):
+        """Dispatches a positional event to the topmost layer under (x, y)."""
+        return self._find_child_pane(x, y).dispatch_event(event, x, y, *args)
 
     def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
-        self._find_child_pane(x, y).dispatch_event('on_mouse_drag', x, y, dx, dy,
-                                                buttons, modifiers)
+        self._dispatch_topdown('on_mouse_drag', x, y, dx, dy, buttons,
+                               modifiers)
 
     def on_mouse_press(self, x, y, button, modifiers):
-        self._find_child_pane(x, y).dispatch_event('on_mouse_press', x, y, button,
-                                                modifiers)
+        self._dispatch_topdown('on_mouse_press', x, y, button, modifiers)
 
     def on_mouse_release(self, x, y, button, modifiers):
-        self._find_child_pane(x, y).dispatch_event('on_mouse_release', x, y,
-                                                button, modifiers)
+        self._dispatch_topdown('on_mouse_release', x, y, button, modifiers)
 
     def on_mouse_scroll(self, x, y, scroll_x, scroll_y):
-        self._find_child_pane(x, y).dispatch_event('on_mouse_scroll', x, y,
-                                                scroll_x, scroll_y)
+        self._dispatch_topdown('on_mouse_scroll', x, y, scroll_x, scroll_y)
 
     def _observe_mouse_pos(self, pos: Optional[Tuple[float, float]]):
         if pos is None:
@@ -412,6 +982,8 @@ class LayersLayout(View):
 
 
 class Spacer(View):
+    __slots__ = ()
+
     def __init__(self, flex_width=True, flex_height=True, **kwargs):
         super().__init__(flex_width=flex_width,
                          flex_height=flex_height,
@@ -1,4 +1,4 @@
-from typing import Any, Callable, Generic, List, Optional, TypeVar, Union
+from typing import Any, Callable, Generic, Optional, Tuple, TypeVar, Union
 
 T = TypeVar('T')
 
@@ -21,6 +21,10 @@ class Observable(Generic[T]):
 
     `o.remove_observer(callback_or_object)` unregisters observer(s)
     """
+    # Every View and Pane holds several observables, so the per-instance
+    # dict is worth trimming away.
+    __slots__ = ('value', '_observers', '_by_owner')
+
     def __init__(self, value: T):
         """Initializes the observable value.
 
@@ -28,7 +32,17 @@ class Observable(Generic[T]):
             value: initial value or None by default.
         """
         self.value: T = value
-        self._observers: List[Callable[[T], None]] = []
+        # Kept as a tuple: `set` iterates the observers far more often than
+        # they are added or removed, and a tuple iterates faster and can't be
+        # mutated under a dispatch in progress.
+        self._observers: Tuple[Callable[[T], None], ...] = ()
+        # Callbacks grouped by the id of their owner (`__self__` for bound
+        # methods, the callback itself otherwise). Detaching a view calls
+        # remove_observer on every observable it may have touched, and most
+        # of those calls find nothing — the dict makes that case a single
+        # lookup instead of a scan of the observers. Allocated lazily on the
+        # first observe: most internal observables never get any observers.
+        self._by_owner: Optional[dict] = None
 
     def set(self, value: T):
         """Updates the value and calls the observers.
@@ -36,7 +50,15 @@ class Observable(Generic[T]):
         The observers *will not be called* if the new value is equal to
         the old one.
         """
-        if self.value != value:
+        if not self._observers:
+            # No one is listening, so skip the equality check (which can be
+            # element-wise for tuples) and just store the value.
+            self.value = value
+            return
+        # The `is` test catches the same object being set again — common when
+        # a cached coordinate tuple is reapplied — without the element-wise
+        # tuple comparison that `!=` would do.
+        if value is not self.value and self.value != value:
             self.value = value
             for observer in self._observers:
                 observer(self.value)
@@ -47,7 +69,12 @@ class Observable(Generic[T]):
         The callback is added to the end of the queue of observers. When the
         value changes it will be called with its new value as a single argument.
         """
-        self._observers.append(observer)
+        self._observers += (observer,)
+        key = id(getattr(observer, '__self__', observer))
+        if self._by_owner is None:
+            self._by_owner = {key: [observer]}
+        else:
+            self._by_owner.setdefault(key, []).append(observer)
 
     def remove_observer(self, observer: Any):
         """Unregisers observer callbacks(s).
@@ -57,13 +84,14 @@ class Observable(Generic[T]):
               observers directly. If it's an object, any observers that are
               methods of this class will be removed.
         """
-        i = 0
-        while i < len(self._observers):
-            if (self._observers[i] is observer or
-                    getattr(self._observers[i], '__self__', None) is observer):
-                del self._observers[i]
-            else:
-                i += 1
+        if self._by_owner is None:
+            return
+        removed = self._by_owner.pop(id(observer), None)
+        if removed is None:
+            return
+        removed_ids = set(map(id, removed))
+        self._observers = tuple(
+            o for o in self._observers if id(o) not in removed_ids)
 
 
 MaybeObservable = Union[T, Observable[T]]
@@ -96,6 +124,8 @@ class Attribute(Generic[T]):
         a.field_.observe(handler)  # adds an observer
         a.field = 200  # will trigger handler
     """
+    __slots__ = ('name',)
+
     def __init__(self, observable_name: str):
         """Constructs observable attribute.
 
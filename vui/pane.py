@@ -1,4 +1,4 @@
-import pyglet.shapes  # type: ignore
+import pyglet.graphics  # type: ignore
 from typing import Optional, Tuple, Union
 
 from . import event
@@ -8,6 +8,34 @@ from .observable import Attribute, MaybeObservable, Observable, make_observable
 # is the bottom left corner and (x1, y1) is top right.
 Coords = Tuple[float, float, float, float]
 
+# Groups shared by all the batched panes with the same draw order. Sharing the
+# group objects lets pyglet merge the background rectangles of all panes at
+# the same depth of the hierarchy (which never overlap) into a single draw
+# call instead of one call per pane.
+_group_cache = {}
+
+# Panes only overlap panes of the same subtree (ancestors/descendants) or of
+# an earlier layer in a LayersLayout. Layouts bump the paint generation for
+# every layer subtree, so ordering by (generation, depth) produces a correct
+# painter's order while letting non-overlapping panes share draw groups. The
+# stride bounds the pane depth within one generation.
+_GENERATION_STRIDE = 2048
+
+
+def _ordered_group(order: int):
+    """Returns the shared group drawn at the given position within a batch.
+
+    pyglet 2 merged OrderedGroup into Group, so support both.
+    """
+    group = _group_cache.get(order)
+    if group is None:
+        if hasattr(pyglet.graphics, 'OrderedGroup'):
+            group = pyglet.graphics.OrderedGroup(order)
+        else:
+            group = pyglet.graphics.Group(order=order)
+        _group_cache[order] = group
+    return group
+
 
 class Pane(event.EventDispatcher):
     """An area in a window owned by a view.
@@ -40,6 +68,16 @@ class Pane(event.EventDispatcher):
         mouse_pos: position of the mouse cursor when mouse is over the active
             area of the pane, None otherwise.
     """
+    # Panes are allocated per view and walked every frame, so like View they
+    # keep their state in slots. `window` is not set by the package itself
+    # but is left for applications that attach the window to the root pane.
+    __slots__ = ('batch', 'depth', 'generation', 'window',
+                 '_alloc_background_group', '_background_group',
+                 'alloc_coords_', 'coords_', 'mouse_pos_',
+                 'alloc_background_color_', 'background_color_',
+                 '_background_shape', '_alloc_background_shape',
+                 '_shapes_visible', '_x0', '_y0', '_x1', '_y1')
+
     alloc_coords: Attribute[Coords] = Attribute('alloc_coords_')
     coords: Attribute[Coords] = Attribute('coords_')
     alloc_background_color: Attribute[Tuple[int, int, int]] = Attribute(
@@ -57,10 +95,38 @@ class Pane(event.EventDispatcher):
                  background_color: MaybeObservable[Tuple[int, int,
                                                            int]] = None,
                  alloc_background_color: MaybeObservable[Tuple[int, int,
-                                                           int]] = None):
+                                                           int]] = None,
+                 batch: Optional[pyglet.graphics.Batch] = None,
+                 depth: int = 0,
+                 generation: int = 0):
+        super().__init__()
+        self.batch = batch
+        self.depth = depth
+        self.generation = generation
+        if batch is not None:
+            # The allocated background of a pane is painted below its active
+            # background, and both above the backgrounds of the parent pane.
+            # Panes of overlapping layers differ in `generation`, which
+            # dominates the order.
+            order = generation * _GENERATION_STRIDE + 2 * depth
+            self._alloc_background_group = _ordered_group(order)
+            self._background_group = _ordered_group(order + 1)
+        else:
+            self._alloc_background_group = None
+            self._background_group = None
         self.alloc_coords_: Observable[Coords] = Observable((x0, y0, x1, y1))
         self.coords_: Observable[Coords] = Observable((x0, y0, x1, y1))
-        self.coords_.observe(self._prepare_background_draw)
+        # Bare copies of `coords` for `contains`, which is called for every
+        # child per mouse event and shouldn't pay for the descriptor and the
+        # tuple indexing on each call.
+        self._x0, self._y0, self._x1, self._y1 = x0, y0, x1, y1
+        self.coords_.observe(self._on_coords_change)
+        # Coordinate changes only move the existing rectangles; rebuilding
+        # (and the color comparison) is reserved for the color observers.
+        # Each observable moves only its own rectangle: rewriting the other
+        # one would re-upload its vertices with unchanged values.
+        self.coords_.observe(self._move_background)
+        self.alloc_coords_.observe(self._move_alloc_background)
         self.mouse_pos_: Observable[Optional[Tuple[float,
                                                    float]]] = Observable(None)
 
@@ -68,6 +134,7 @@ class Pane(event.EventDispatcher):
             int, int, int]]] = make_observable(alloc_background_color)
         self.background_color_: Observable[Optional[Tuple[
             int, int, int]]] = make_observable(background_color)
+        self._shapes_visible = True
         self.alloc_background_color_.observe(self._prepare_background_draw)
         self.background_color_.observe(self._prepare_background_draw)
         self._prepare_background_draw()
@@ -92,30 +159,90 @@ class Pane(event.EventDispatcher):
     def height(self):
         return self.coords[3] - self.coords[1]
 
+    def _update_shape(self, shape, coords, color, group):
+        """Creates, updates in place or deletes a background rectangle.
+
+        Creating a Rectangle allocates a new vertex list, which is wasteful
+        when only the coordinates change (every drag frame during a resize),
+        so an existing shape is moved and recolored in place instead.
+        """
+        if color is None:
+            if shape is not None:
+                shape.delete()
+            return None
+        x0, y0, x1, y1 = coords
+        if shape is None:
+            # Deferred so that panes without backgrounds never load the
+            # shapes module; after the first shape this resolves from
+            # sys.modules.
+            import pyglet.shapes  # type: ignore
+            shape = pyglet.shapes.Rectangle(x=x0,
+                                            y=y0,
+                                            width=(x1 - x0),
+                                            height=(y1 - y0),
+                                            color=color,
+                                            batch=self.batch,
+                                            group=group)
+            if not self._shapes_visible:
+                shape.visible = False
+            return shape
+        shape.position = (x0, y0)
+        shape.width = x1 - x0
+        shape.height = y1 - y0
+        if tuple(shape.color[:3]) != tuple(color):
+            shape.color = color
+        return shape
+
+    def set_background_visible(self, visible: bool):
+        """Shows or hides the background rectangles without deleting them.
+
+        Called by the attached view when its `hidden` attribute changes.
+        Batched shapes are painted by the root batch outside of the pane's
+        on_draw dispatch, so suppressing the dispatch alone does not stop a
+        hidden view's background from being drawn.
+        """
+        self._shapes_visible = visible
+        if self._background_shape is not None:
+            self._background_shape.visible = visible
+        if self._alloc_background_shape is not None:
+            self._alloc_background_shape.visible = visible
+
+    def _move_background(self, *args):
+        """Repositions the active-area rectangle in place.
+
+        Registered for `coords_`. Unlike `_prepare_background_draw` it never
+        creates or deletes shapes and skips the color comparison, so a drag
+        or resize frame costs only the vertex updates. The observers only
+        fire on real changes, so every write here is meaningful.
+        """
+        shape = self._background_shape
+        if shape is not None:
+            x0, y0, x1, y1 = self.coords_.value
+            shape.position = (x0, y0)
+            shape.width = x1 - x0
+            shape.height = y1 - y0
+
+    def _move_alloc_background(self, *args):
+        """Same as `_move_background` for the allocated-area rectangle."""
+        shape = self._alloc_background_shape
+        if shape is not None:
+            x0, y0, x1, y1 = self.alloc_coords_.value
+            shape.position = (x0, y0)
+            shape.width = x1 - x0
+            shape.height = y1 - y0
+
     def _prepare_background_draw(self, *args):
-        if self.background_color is not None:
-            x0, y0, x1, y1 = self.coords
-            self._background_shape = pyglet.shapes.Rectangle(
-                x=x0,
-                y=y0,
-                width=(x1 - x0),
-                height=(y1 - y0),
-                color=self.background_color)
-        else:
-            self._background_shape = None
-
-        if self.alloc_background_color is not None:
-            x0, y0, x1, y1 = self.alloc_coords
-            self._alloc_background_shape = pyglet.shapes.Rectangle(
-                x=x0,
-                y=y0,
-                width=(x1 - x0),
-                height=(y1 - y0),
-                color=self.alloc_background_color)
-        else:
-            self._alloc_background_shape = None
+        self._background_shape = self._update_shape(
+            getattr(self, '_background_shape', None), self.coords,
+            self.background_color, self._background_group)
+        self._alloc_background_shape = self._update_shape(
+            getattr(self, '_alloc_background_shape', None), self.alloc_coords,
+            self.alloc_background_color, self._alloc_background_group)
 
     def _draw_background(self):
+        # Batched shapes are drawn once per frame by the RootLayout batch.
+        if self.batch is not None:
+            return
         if self._alloc_background_shape is not None:
             self._alloc_background_shape.draw()
         if self._background_shape is not None:
@@ -125,9 +252,11 @@ class Pane(event.EventDispatcher):
     def on_draw(self):
         self._draw_background()
 
+    def _on_coords_change(self, coords):
+        self._x0, self._y0, self._x1, self._y1 = coords
+
     def contains(self, x, y):
-        x0, y0, x1, y1 = self.coords
-        return x0 <= x < x1 and y0 <= y < y1
+        return self._x0 <= x < self._x1 and self._y0 <= y < self._y1
 
     def swap_background(self, background_color_):
         """Replace background_color with a new external observable."""
@@ -150,6 +279,8 @@ Pane.register_event_type('on_mouse_scroll')
 
 
 class DummyPane(Pane):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(0, 0, 0, 0)
 
@@ -1,3 +1,4 @@
+import pyglet  # type: ignore
 import unittest
 from unittest.mock import Mock, patch
 
@@ -16,11 +17,29 @@ class MyView(View):
         self.on_draw_calls += 1
 
 
+class _FakeWindow(object):
+    """A minimal stand-in for pyglet.window.Window.
+
+    A Mock would work, but every attribute access on a Mock records the
+    call and materializes child mocks, which dominates the timing of these
+    tests and hides what RootLayout itself costs.
+    """
+    __slots__ = ('width', 'height')
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+    def push_handlers(self, *args, **kwargs):
+        pass
+
+    def remove_handlers(self, *args, **kwargs):
+        pass
+
+
 class RootLayoutTest(unittest.TestCase):
     def test_init_root(self):
-        window = Mock()
-        window.width = 200
-        window.height = 100
+        window = _FakeWindow(200, 100)
         view = MyView(background_color=(1, 2, 3))
 
         layout = RootLayout(window, view)
@@ -37,10 +56,7 @@ class RootLayoutTest(unittest.TestCase):
         self.assertEqual(view.on_draw_calls, 1)
 
     def test_mouseover(self):
-        window = Mock()
-        window.width = 200
-        window.height = 100
-        layout = RootLayout(window)
+        layout = RootLayout(_FakeWindow(200, 100))
 
         callback = Mock()
         layout.child_pane.mouse_pos_.observe(callback)
@@ -55,7 +71,10 @@ class RootLayoutTest(unittest.TestCase):
         callback.reset_mock()
         self.assertEqual(layout.child_pane.mouse_pos, (50, 50))
 
+        # Plain motion is coalesced and applied on the next frame.
         layout.on_mouse_motion(51, 51, 1, 1)
+        callback.assert_not_called()
+        layout.on_draw()
         callback.assert_called_once_with((51, 51))
         callback.reset_mock()
         self.assertEqual(layout.child_pane.mouse_pos, (51, 51))
@@ -131,6 +150,16 @@ class HStackLayoutTest(unittest.TestCase):
         self.assertEqual(self.child2.on_draw_calls, 1)
         self.assertEqual(self.child3.on_draw_calls, 0)
 
+    def test_translation_cache_bounded(self):
+        size = len(self.stack._layout_cache)
+        # A translation-only animation must not grow the layout cache with
+        # an entry per position.
+        for i in range(1, 100):
+            self.pane.coords = (100 + i, 150, 600 + i, 550)
+        self.assertLessEqual(len(self.stack._layout_cache), size)
+        self.assertEqual(self.child1.pane.alloc_coords, (199, 150, 599, 550))
+        self.assertEqual(self.child2.pane.alloc_coords, (599, 150, 699, 550))
+
     def test_mouse_press(self):
         self.child3.hidden = False
 
@@ -178,6 +207,24 @@ class VStackLayoutTest(unittest.TestCase):
         self.assertEqual(child1.pane.alloc_coords, (100, 300, 500, 550))
         self.assertEqual(child2.pane.alloc_coords, (100, 150, 500, 300))
 
+    def test_hidden_background(self):
+        child1 = FakeView(min_height=100,
+                          flex_height=True,
+                          background_color=(10, 20, 30))
+        child2 = FakeView(min_height=100, flex_height=True)
+        stack = VStackLayout(child1, child2)
+        pane = Pane(0, 0, 200, 100, batch=pyglet.graphics.Batch())
+        stack.attach(pane)
+
+        shape = child1.pane._background_shape
+        self.assertTrue(shape.visible)
+        # The batch paints the shape regardless of the on_draw dispatch, so
+        # hiding the view has to hide the shape itself.
+        child1.hidden = True
+        self.assertFalse(shape.visible)
+        child1.hidden = False
+        self.assertTrue(shape.visible)
+
     def test_horizontal_overflow(self):
         child1 = FakeView(min_height=100,
                           flex_height=True,
@@ -244,6 +291,20 @@ class LayersLayoutTest(unittest.TestCase):
         self.assertEqual(self.child2.on_draw_calls, 1)
         self.assertEqual(self.child3.on_draw_calls, 0)
 
+    def test_layer_batches(self):
+        child1 = FakeView()
+        child2 = FakeView()
+        layers = LayersLayout(child1, child2)
+        pane = Pane(0, 0, 200, 100, batch=pyglet.graphics.Batch())
+        layers.attach(pane)
+
+        # Each layer draws its backgrounds into a batch of its own, so that
+        # they can be flushed between the layer traversals.
+        self.assertIsNotNone(child1.pane.batch)
+        self.assertIsNotNone(child2.pane.batch)
+        self.assertIsNot(child1.pane.batch, pane.batch)
+        self.assertIsNot(child1.pane.batch, child2.pane.batch)
+
     def test_on_mouse_press(self):
         self.pane.dispatch_event('on_mouse_press', 300, 300, 1, 0)
         self.assertEqual(self.child1.on_mouse_press_calls, 0)
@@ -12,27 +12,31 @@ class PaneTest(unittest.TestCase):
         self.assertEqual(pane._background_shape, None)
 
     def test_with_background(self):
-        pane = Pane(0, 0, 100, 100, background=(127, 127, 127))
+        pane = Pane(0, 0, 100, 100, background_color=(127, 127, 127))
         self.assertTrue(
             isinstance(pane._background_shape, pyglet.shapes.Rectangle))
         self.assertEqual(pane._background_shape.x, 0)
         self.assertEqual(pane._background_shape.y, 0)
         self.assertEqual(pane._background_shape.width, 100)
         self.assertEqual(pane._background_shape.height, 100)
-        self.assertEqual(pane._background_shape.color, (127, 127, 127))
+        # pyglet 2 reports the color with the alpha channel.
+        self.assertEqual(tuple(pane._background_shape.color)[:3],
+                         (127, 127, 127))
 
     def test_update_background(self):
         pane = Pane(0, 0, 100, 100,
-                    background=(127, 127, 127))
+                    background_color=(127, 127, 127))
+        shape = pane._background_shape
         pane.coords = (100, 100, 200, 200)
         pane.background_color = (255, 255, 255)
-        self.assertTrue(
-            isinstance(pane._background_shape, pyglet.shapes.Rectangle))
+        # The rectangle is updated in place, not recreated.
+        self.assertIs(pane._background_shape, shape)
         self.assertEqual(pane._background_shape.x, 100)
         self.assertEqual(pane._background_shape.y, 100)
         self.assertEqual(pane._background_shape.width, 100)
         self.assertEqual(pane._background_shape.height, 100)
-        self.assertEqual(pane._background_shape.color, (255, 255, 255))
+        self.assertEqual(tuple(pane._background_shape.color)[:3],
+                         (255, 255, 255))
 
 
 if __name__ == '__main__':
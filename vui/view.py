@@ -1,4 +1,4 @@
-from enum import Enum
+from enum import IntEnum
 from typing import Optional, Tuple, Union
 
 from .pane import Pane, DUMMY_PANE
@@ -6,7 +6,7 @@ from . import event
 from .observable import Attribute, MaybeObservable, Observable, make_observable
 
 
-class HAlign(Enum):
+class HAlign(IntEnum):
     """Horizontal alignment of a pane within owning pane.
 
     This enum determines how the pane controlled by a given View will be located
@@ -22,7 +22,7 @@ class HAlign(Enum):
     FILL = 4
 
 
-class VAlign(Enum):
+class VAlign(IntEnum):
     """Vertical alignment of a pane within owning pane.
 
     Similar to `HAlign` but for vertical space.
@@ -34,21 +34,24 @@ class VAlign(Enum):
     FILL = 4
 
 
+# Fraction of the slack placed before the view, indexed by the shared
+# HAlign/VAlign numbering: LEFT/BOTTOM take none of it, CENTER half,
+# RIGHT/TOP all. None marks FILL (and the reserved 0), which takes the whole
+# span regardless.
+_ALIGN_FACTOR = (None, 0.0, 0.5, 1.0, None)
+
+
 def _calc_coords(lo: float, hi: float, dim: float, align: Union[HAlign, VAlign]):
+    # A single table lookup instead of a branch ladder; the IntEnum member
+    # indexes the tuple directly.
+    factor = _ALIGN_FACTOR[align]
     extra = hi - lo - dim
-    # print('_calc_coords lo={} hi={} dim={} align={} extra={}'.format(lo, hi, dim, align, extra))
-    if align.value == 4 or extra <= 0:
+    if factor is None or extra <= 0:
         # If FILL or the space is too small, we just take all the available
         # space.
         return lo, hi
-    if align.value == 1:
-        return lo, lo + dim
-    if align.value == 2:
-        l = lo + extra / 2
-        return l, l + dim
-    if align.value == 3:
-        return hi - dim, hi
-    raise ValueError("Unexpected alignment: {}".format(align))
+    lo += extra * factor
+    return lo, lo + dim
 
 
 class View(object):
@@ -89,6 +92,16 @@ class View(object):
         to min_width/min_height if it's defined, otherwise to
         content_width/content_height.
     """
+    # Views are constructed in bulk and their attributes are read on every
+    # draw and relayout, so they keep their state in slots instead of a
+    # per-instance dict. __weakref__ is needed because panes hold event
+    # handlers through weak references.
+    __slots__ = ('__weakref__', 'pane', 'min_width_', 'min_height_',
+                 'content_width_', 'content_height_', 'derived_width_',
+                 'derived_height_', 'flex_width_', 'flex_height_', 'halign_',
+                 'valign_', 'background_color_', 'alloc_background_color_',
+                 'hidden_', '_all_observables')
+
     min_width: Attribute[Optional[float]] = Attribute('min_width_')
     min_height: Attribute[Optional[float]] = Attribute('min_height_')
     content_width: Attribute[Optional[float]] = Attribute('content_width_')
@@ -130,27 +143,39 @@ class View(object):
         self.content_height_.observe(self._calc_height)
         self.derived_width_: Observable[float] = Observable(0)
         self.derived_height_: Observable[float] = Observable(0)
-        self.derived_width_.observe(self._update_pane)
-        self.derived_height_.observe(self._update_pane)
 
         self.flex_width_: Observable[bool] = make_observable(flex_width)
         self.flex_height_: Observable[bool] = make_observable(flex_height)
 
         self.halign_: Observable[HAlign] = make_observable(halign)
         self.valign_: Observable[VAlign] = make_observable(valign)
-        self.halign_.observe(self._update_pane)
-        self.valign_.observe(self._update_pane)
+        self.halign_.observe(self._on_halign)
+        self.valign_.observe(self._on_valign)
+        # For FILL the active coords span the whole allocation and don't
+        # depend on the derived size, so the derived observers are only
+        # wired for the other alignments (_on_halign/_on_valign keep this in
+        # sync when the alignment changes). Content churn in a filling view
+        # then never reaches the pane coords.
+        if self.halign_.value != HAlign.FILL:
+            self.derived_width_.observe(self._update_pane_x)
+        if self.valign_.value != VAlign.FILL:
+            self.derived_height_.observe(self._update_pane_y)
 
         self.background_color_: Observable[Optional[Tuple[
             int, int, int]]] = make_observable(background_color)
         self.alloc_background_color_: Observable[Optional[Tuple[
             int, int, int]]] = make_observable(alloc_background_color)
         self.hidden_: Observable[bool] = make_observable(hidden)
-        self.hidden_.observe(self._calc_width)
-        self.hidden_.observe(self._calc_height)
+        self.hidden_.observe(self._calc_dims)
 
-        self._calc_width()
-        self._calc_height()
+        # Everything remove_observer has to sweep, gathered once.
+        self._all_observables = (
+            self.min_width_, self.min_height_, self.content_width_,
+            self.content_height_, self.derived_width_, self.derived_height_,
+            self.flex_width_, self.flex_height_, self.halign_, self.valign_,
+            self.background_color_, self.hidden_)
+
+        self._calc_dims()
 
     def __str__(self):
         return '{}[{}]{}'.format(self.__class__.__name__, self.pane,
@@ -168,6 +193,8 @@ class View(object):
             pane.push_handlers(on_draw=self.on_draw_check_hidden)
             pane.swap_background(self.background_color_)
             pane.swap_alloc_background(self.alloc_background_color_)
+            if self.hidden_.value:
+                pane.set_background_visible(False)
             pane.alloc_coords_.observe(self._update_pane)
             self._update_pane()
 
@@ -179,54 +206,120 @@ class View(object):
         self.pane.swap_background(None)
 
     def remove_observer(self, observer):
-        self.min_width_.remove_observer(observer)
-        self.min_height_.remove_observer(observer)
-        self.content_width_.remove_observer(observer)
-        self.content_height_.remove_observer(observer)
-        self.derived_width_.remove_observer(observer)
-        self.derived_height_.remove_observer(observer)
-        self.flex_width_.remove_observer(observer)
-        self.flex_height_.remove_observer(observer)
-        self.halign_.remove_observer(observer)
-        self.valign_.remove_observer(observer)
-        self.background_color_.remove_observer(observer)
-        self.hidden_.remove_observer(observer)
+        for observable in self._all_observables:
+            observable.remove_observer(observer)
+
+    def _on_halign(self, align):
+        # remove_observer(self) drops all of this view's callbacks from the
+        # observable; _update_pane_x is the only one it registers there.
+        self.derived_width_.remove_observer(self)
+        if align != HAlign.FILL:
+            self.derived_width_.observe(self._update_pane_x)
+        self._update_pane_x()
+
+    def _on_valign(self, align):
+        self.derived_height_.remove_observer(self)
+        if align != VAlign.FILL:
+            self.derived_height_.observe(self._update_pane_y)
+        self._update_pane_y()
 
     def _update_pane(self, *args):
-        """Sets active pane coords."""
-        if self.pane is None:
+        """Sets active pane coords.
+
+        Fires for every allocation, size and alignment change, so the pane
+        and the helper are bound to locals and the inputs come straight off
+        the observables.
+        """
+        pane = self.pane
+        if pane is None:
+            return
+        if self.hidden_.value:
+            # Nothing is rendered while hidden, so allocation and alignment
+            # changes are not worth reacting to; _calc_dims refreshes the
+            # coords when the view is revealed.
             return
-        ox0, oy0, ox1, oy1 = self.pane.alloc_coords
-        x0, x1 = _calc_coords(ox0, ox1, self.derived_width, self.halign)
-        y0, y1 = _calc_coords(oy0, oy1, self.derived_height, self.valign)
-        self.pane.coords = (x0, y0, x1, y1)
+        ox0, oy0, ox1, oy1 = pane.alloc_coords_.value
+        calc = _calc_coords
+        x0, x1 = calc(ox0, ox1, self.derived_width_.value, self.halign_.value)
+        y0, y1 = calc(oy0, oy1, self.derived_height_.value,
+                      self.valign_.value)
+        pane.coords_.set((x0, y0, x1, y1))
 
-    def on_mouse_enter(self, *args):
+    def _update_pane_x(self, *args):
+        """Recomputes only the horizontal coords.
+
+        Registered for the width and halign observables, which can't move
+        the vertical span; the full _update_pane stays wired to
+        alloc_coords_, which changes both axes.
+        """
+        pane = self.pane
+        if pane is None:
+            return
+        if self.hidden_.value:
+            return
+        ox0, _, ox1, _ = pane.alloc_coords_.value
+        x0, x1 = _calc_coords(ox0, ox1, self.derived_width_.value,
+                              self.halign_.value)
+        _, y0, _, y1 = pane.coords_.value
+        pane.coords_.set((x0, y0, x1, y1))
+
+    def _update_pane_y(self, *args):
+        """Same as `_update_pane_x` for the vertical coords."""
+        pane = self.pane
+        if pane is None:
+            return
+        if self.hidden_.value:
+            return
+        _, oy0, _, oy1 = pane.alloc_coords_.value
+        y0, y1 = _calc_coords(oy0, oy1, self.derived_height_.value,
+                              self.valign_.value)
+        x0, _, x1, _ = pane.coords_.value
+        pane.coords_.set((x0, y0, x1, y1))
+
+    def on_mouse_enter(self, x, y):
         self.pane.window.set_mouse_cursor(None)
 
     @event.priority(2)
     def on_draw_check_hidden(self):
-        if self.hidden:
+        # Runs once per pane per frame; reads the observable directly.
+        if self.hidden_.value:
             return event.EVENT_HANDLED
 
+    def _calc_dims(self, *args):
+        """Recomputes both derived dimensions with one observer call.
+
+        Registered for hidden_, which affects both axes at once.
+        """
+        self._calc_width()
+        self._calc_height()
+        pane = self.pane
+        if pane is None:
+            return
+        hidden = self.hidden_.value
+        # The background shapes live in the root batch, which is drawn
+        # without consulting on_draw_check_hidden, so they are hidden and
+        # revealed explicitly.
+        pane.set_background_visible(not hidden)
+        if not hidden:
+            # Catches up on the allocation changes skipped while hidden.
+            self._update_pane()
+
     def _calc_width(self, *args):
-        if self.hidden:
-            self.derived_width = 0
-        elif self.min_width is None:
-            if self.content_width is None:
-                self.derived_width = 0
-            else:
-                self.derived_width = self.content_width
-        else:
-            self.derived_width = self.min_width
+        # Reads and writes the raw observables: this runs for every input
+        # change and the descriptor round-trips triple its cost.
+        if self.hidden_.value:
+            self.derived_width_.set(0)
+            return
+        width = self.min_width_.value
+        if width is None:
+            width = self.content_width_.value or 0
+        self.derived_width_.set(width)
 
     def _calc_height(self, *args):
-        if self.hidden:
-            self.derived_height = 0
-        elif self.min_height is None:
-            if self.content_height is None:
-                self.derived_height = 0
-            else:
-                self.derived_height = self.content_height
-        else:
-            self.derived_height = self.min_height
+        if self.hidden_.value:
+            self.derived_height_.set(0)
+            return
+        height = self.min_height_.value
+        if height is None:
+            height = self.content_height_.value or 0
+        self.derived_height_.set(height)